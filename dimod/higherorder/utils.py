@@ -12,10 +12,11 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
-from typing import Tuple, List, Hashable, FrozenSet
+from typing import Tuple, List, Hashable, FrozenSet, Iterable
 from numbers import Number
 
 import itertools
+import sys
 import warnings
 
 from collections import Counter
@@ -32,7 +33,11 @@ from dimod.higherorder.polynomial import BinaryPolynomial
 from dimod.sampleset import as_samples
 from dimod.vartypes import as_vartype, Vartype
 
-__all__ = ['make_quadratic', 'make_quadratic_cqm', 'reduce_binary_polynomial']
+__all__ = ['make_quadratic',
+           'make_quadratic_cqm',
+           'reduce_binary_polynomial',
+           'reduce_binary_polynomial_batch',
+           ]
 
 
 def _spin_product(variables):
@@ -65,22 +70,38 @@ def _spin_product(variables):
 
 def _new_product(variables, u, v):
     # make a new product variable not in variables, then add it
-    p = '{}*{}'.format(u, v)
+    p = f'{u}*{v}'
     while p in variables:
         p = '_' + p
+    p = sys.intern(p)
     variables.add(p)
     return p
 
 
 def _new_aux(variables, u, v):
     # make a new auxiliary variable not in variables, then add it
-    aux = 'aux{},{}'.format(u, v)
+    aux = f'aux{u},{v}'
     while aux in variables:
         aux = '_' + aux
+    aux = sys.intern(aux)
     variables.add(aux)
     return aux
 
 
+def _pair_key(u, v):
+    # canonical key for the unordered pair of variable indices {u, v}, packed
+    # into a single int which is cheaper to build and hash than a tuple
+    return (u << 32) | v if u < v else (v << 32) | u
+
+
+def _unpack_pair(key):
+    return key >> 32, key & 0xFFFFFFFF
+
+
+def _pair(u, v):
+    return (u, v) if u < v else (v, u)
+
+
 def _decrement_count(idx, que, pair):
     count = len(idx[pair])
     que_count = que[count]
@@ -91,9 +112,9 @@ def _decrement_count(idx, que, pair):
         que[count - 1].add(pair)
 
 
-def _remove_old(idx, term, pair):
+def _remove_old(idx, tid, pair):
     idx_pair = idx[pair]
-    del idx_pair[term]
+    idx_pair.remove(tid)
     if not idx_pair:
         del idx[pair]
 
@@ -122,54 +143,189 @@ def reduce_binary_polynomial(poly: BinaryPolynomial) -> Tuple[
          [(frozenset({0, 1}), '0*1')])
     """
 
-    variables = poly.variables
-    constraints = []
+    return reduce_binary_polynomial_batch([poly])[0]
+
+
+def reduce_binary_polynomial_batch(polys: Iterable[BinaryPolynomial]) -> List[Tuple[
+        List[Tuple[FrozenSet[Hashable], Number]],
+        List[Tuple[FrozenSet[Hashable], Hashable]]
+    ]]:
+    """Reduce several binary polynomials that share their variables.
+
+    Equivalent to calling :func:`reduce_binary_polynomial` on each
+    polynomial, except that the variables are indexed once for all of them
+    and a pair of variables reduced in more than one polynomial is replaced
+    by the same auxiliary variable in each.
+
+    Each list of constraints holds all the constraints that its reduced
+    terms rely on, so a constraint shared by several polynomials appears in
+    each of their lists.
+
+    Args:
+        polys: Iterable of BinaryPolynomial
+
+    Returns:
+        [([(term, bias)*], [((orig_var1, orig_var2), aux_var)*])*]
+
+    Example:
+        >>> polys = [dimod.BinaryPolynomial({(0, 1, 2): -2}, dimod.BINARY),
+        ...          dimod.BinaryPolynomial({(0, 1, 3): 1}, dimod.BINARY)]
+        >>> reduce_binary_polynomial_batch(polys) # doctest: +SKIP
+        [([(frozenset({'0*1', 2}), -2)], [(frozenset({0, 1}), '0*1')]),
+         ([(frozenset({'0*1', 3}), 1)], [(frozenset({0, 1}), '0*1')])]
+    """
+    polys = list(polys)
+
+    # work with contiguous integer indices rather than the variable labels,
+    # they are cheap to hash and compare and they can always be ordered
+    labels = list(set().union(*(poly.variables for poly in polys)))
+    index = {v: i for i, v in enumerate(labels)}
+    to_index = index.__getitem__
+    num_variables = len(labels)
+
+    variables = set(labels)
+    products = {}  # shared by all of the polynomials
+
+    results = []
+    for poly in polys:
+        # split the terms in a single pass over poly.items(), which is the
+        # only time we iterate over the polynomial's terms and biases
+        reduced_terms = []
+        terms = []
+        biases = []
+        for term, bias in poly.items():
+            if len(term) > 2:
+                terms.append(tuple(sorted(map(to_index, term))))
+                biases.append(bias)
+            else:
+                reduced_terms.append((term, bias))
+
+        indexed_terms, indexed_constraints = _reduce_indexed(
+            terms, biases, num_variables, products)
+
+        # the product variables are indexed in the order they were created,
+        # so each new one can be labelled from the labels of its (earlier)
+        # pair
+        constraints = []
+        for u, v, p in indexed_constraints:
+            u = labels[u]
+            v = labels[v]
+            if p == len(labels):
+                labels.append(_new_product(variables, u, v))
+            constraints.append((frozenset((u, v)), labels[p]))
+
+        reduced_terms.extend((frozenset(map(labels.__getitem__, term)), bias)
+                             for term, bias in indexed_terms)
+
+        results.append((reduced_terms, constraints))
+
+    return results
+
+
+def _reduce_indexed(terms, biases, num_variables, products=None):
+    # Reduce the higher-order terms of a polynomial over the variables
+    # 0..num_variables-1. Each term is a sorted tuple of variable indices, as
+    # are the returned terms. The constraints are (u, v, p) triplets.
+    # products maps packed pairs to the index of their product variable. It
+    # is updated in-place, so passing the same dict when reducing several
+    # polynomials lets them share their products. New product variables are
+    # indexed num_variables + len(products) in the order they are created.
+    if products is None:
+        products = {}
 
     reduced_terms = []
-    idx = defaultdict(dict)
-    for item in poly.items():
-        term, bias = item
-        if len(term) <= 2:
-            reduced_terms.append(item)
-        else:
-            for pair in itertools.combinations(term, 2):
-                idx[frozenset(pair)][term] = bias
+    constraints = []
+
+    def product(pair):
+        p = products.get(pair)
+        if p is None:
+            p = products[pair] = num_variables + len(products)
+        return p
+
+    # the index maps each pair to the set of ids of the terms containing it,
+    # where a term's id is its position in term_list. Reducing a term keeps
+    # its bias, so we rewrite it in place and keep its id. That way the pairs
+    # it keeps do not need to be touched
+    term_list = list(terms)
+    idx = defaultdict(set)
+    for tid, term in enumerate(term_list):
+        # pairs of a sorted term are already ordered
+        for u, v in itertools.combinations(term, 2):
+            idx[(u << 32) | v].add(tid)
+
+    # a cubic term that shares none of its pairs with another term needs only
+    # one product whichever pair we choose, so we reduce it straight away
+    # rather than queuing its pairs
+    for tid, term in enumerate(terms):
+        if len(term) == 3:
+            u, v, w = term
+            uv = (u << 32) | v
+            uw = (u << 32) | w
+            vw = (v << 32) | w
+            if len(idx[uv]) == len(idx[uw]) == len(idx[vw]) == 1:
+                del idx[uv], idx[uw], idx[vw]
+                # prefer a pair that already has a product
+                if uv not in products:
+                    if uw in products:
+                        uv, v, w = uw, w, v
+                    elif vw in products:
+                        uv, u, w = vw, w, u
+                prod_var = product(uv)
+                constraints.append((*_pair(u, v), prod_var))
+                reduced_terms.append((_pair(w, prod_var), biases[tid]))
 
     que = defaultdict(set)
-    for pair, terms in idx.items():
-        que[len(terms)].add(pair)
+    for pair, pair_terms in idx.items():
+        que[len(pair_terms)].add(pair)
 
+    # the counts only ever decrease, and the pairs we add are never shared by
+    # more terms than the pair we just popped, so rather than searching the
+    # queue for the largest count each time, we walk down from the last one
+    most = max(que, default=0)
     while idx:
         new_pairs = set()
-        most = max(que)
+        while most not in que:
+            most -= 1
         que_most = que[most]
         pair = que_most.pop()
         if not que_most:
             del que[most]
-        terms = idx.pop(pair)
-
-        prod_var = _new_product(variables, *pair)
-        constraints.append((pair, prod_var))
-        prod_var_set = {prod_var}
-
-        for old_term, bias in terms.items():
-            common_subterm = (old_term - pair)
-            new_term = common_subterm | prod_var_set
-
-            for old_pair in map(frozenset, itertools.product(pair, common_subterm)):
-                _decrement_count(idx, que, old_pair)
-                _remove_old(idx, old_term, old_pair)
-
-            for common_pair in map(frozenset, itertools.combinations(common_subterm, 2)):
-                idx[common_pair][new_term] = bias
-                _remove_old(idx, old_term, common_pair)
+        pair_terms = idx.pop(pair)
+        prod_var = product(pair)
+        pu, pv = _unpack_pair(pair)
+        constraints.append((pu, pv, prod_var))
+
+        for tid in pair_terms:
+            common_subterm = tuple(v for v in term_list[tid] if v != pu and v != pv)
+            if common_subterm and common_subterm[-1] > prod_var:
+                # only possible when reusing a product from products
+                new_term = tuple(sorted(common_subterm + (prod_var,)))
+            else:
+                # a new product has the largest index so far, so new_term
+                # stays sorted
+                new_term = common_subterm + (prod_var,)
 
-            if len(new_term) > 2:
-                for new_pair in (frozenset((prod_var, v)) for v in common_subterm):
-                    idx[new_pair][new_term] = bias
-                    new_pairs.add(new_pair)
+            higher_order = len(new_term) > 2
+            if higher_order:
+                term_list[tid] = new_term
             else:
-                reduced_terms.append((new_term, bias))
+                reduced_terms.append((new_term, biases[tid]))
+
+            # the pairs within the common subterm are unchanged, so we only
+            # need to update the pairs made with the reduced pair or with the
+            # product
+            for v in common_subterm:
+                k0 = _pair_key(pu, v)
+                k1 = _pair_key(pv, v)
+                _decrement_count(idx, que, k0)
+                _decrement_count(idx, que, k1)
+                _remove_old(idx, tid, k0)
+                _remove_old(idx, tid, k1)
+
+                if higher_order:
+                    new_pair = _pair_key(v, prod_var)
+                    idx[new_pair].add(tid)
+                    new_pairs.add(new_pair)
 
         for new_pair in new_pairs:
             que[len(idx[new_pair])].add(new_pair)
@@ -202,19 +358,28 @@ def _init_binary_polynomial(poly, vartype):
     return poly
 
 def _init_objective(bqm, reduced_terms):
+    # sort the terms by degree in one pass so that they can be added with
+    # the bulk methods rather than one at a time
+    linear = []
+    quadratic = []
+    offset = 0
     for term, bias in reduced_terms:
         if len(term) == 2:
-            bqm.add_interaction(*term , bias)
+            quadratic.append((*term, bias))
         elif len(term) == 1:
-            bqm.add_variable(*term, bias)
+            linear.append((*term, bias))
         elif len(term) == 0:
-            bqm.offset += bias
+            offset += bias
         else:
             # still has higher order terms, this shouldn't happen
             msg = ('Internal error: not all higher-order terms were reduced. '
                    'Please file a bug report.')
             raise RuntimeError(msg)
 
+    bqm.add_linear_from(linear)
+    bqm.add_quadratic_from(quadratic)
+    bqm.offset += offset
+
 def make_quadratic_cqm(poly, vartype=None, cqm=None):
     """Create a constrained quadratic model from a higher order polynomial.
 
@@ -251,11 +416,11 @@ def make_quadratic_cqm(poly, vartype=None, cqm=None):
     poly = _init_binary_polynomial(poly, vartype)
     reduced_terms, constraints = reduce_binary_polynomial(poly)
 
-    def var(x):
-        return BinaryQuadraticModel({x: 1.0}, {}, 0.0, vartype)
-
     for (u, v), p in constraints:
-        cqm.add_constraint( var(u)*var(v) - var(p)  == 0, label = f"'{u}'*'{v}' == '{p}'")
+        # build u*v - p directly rather than from single-variable models
+        constraint = BinaryQuadraticModel({u: 0.0, v: 0.0, p: -1.0}, {(u, v): 1.0}, 0.0, vartype)
+        cqm.add_constraint_from_model(constraint, '==', rhs=0, label=f"'{u}'*'{v}' == '{p}'",
+                                      copy=False)
 
     obj = BinaryQuadraticModel(vartype=vartype)
     _init_objective(obj, reduced_terms)
@@ -303,29 +468,56 @@ def make_quadratic(poly, strength, vartype=None, bqm=None):
     bqm, vartype = _init_quadratic_model(bqm, vartype, BinaryQuadraticModel)
     poly = _init_binary_polynomial(poly, vartype)
 
-    variables = set().union(*poly)
     reduced_terms, constraints = reduce_binary_polynomial(poly)
 
+    # the auxiliary variables must not collide with the original variables
+    # or with the products
+    variables = poly.variables
+    variables.update(p for _, p in constraints)
+
+    # accumulate the constraints so they can be added to the bqm in bulk
+    linear = defaultdict(float)
+    quadratic = defaultdict(float)
+    offset = 0
+
     for (u, v), p in constraints:
 
         # add a constraint enforcing the relationship between p == u*v
         if vartype is Vartype.BINARY:
             constraint = and_gate(u, v, p)
             bqm.info['reduction'][(u, v)] = {'product': p}
+
+            # scale constraint and update the polynomial with it
+            constraint.scale(strength)
+            for w, bias in constraint.linear.items():
+                linear[w] += bias
+            for uv, bias in constraint.quadratic.items():
+                quadratic[uv] += bias
+            offset += constraint.offset
         elif vartype is Vartype.SPIN:
             aux = _new_aux(variables, u, v)  # need an aux in SPIN-space
-            constraint = _spin_product([u, v, p, aux])
             bqm.info['reduction'][(u, v)] = {'product': p, 'auxiliary': aux}
+
+            # add the biases of _spin_product([u, v, p, aux]) scaled by
+            # strength, without constructing it
+            half = .5 * strength
+            linear[u] -= half
+            linear[v] -= half
+            linear[p] -= half
+            linear[aux] -= strength
+            quadratic[u, v] += half
+            quadratic[u, p] += half
+            quadratic[u, aux] += strength
+            quadratic[v, p] += half
+            quadratic[v, aux] += strength
+            quadratic[p, aux] += strength
+            offset += 2. * strength
         else:
             raise RuntimeError("unknown vartype: {!r}".format(vartype))
 
-        # scale constraint and update the polynomial with it
-        constraint.scale(strength)
-        for v, bias in constraint.linear.items():
-            bqm.add_variable(v, bias)
-        for uv, bias in constraint.quadratic.items():
-            bqm.add_interaction(*uv, bias)
-        bqm.offset += constraint.offset
+    bqm.add_linear_from(linear)
+    bqm.add_quadratic_from(quadratic)
+    bqm.offset += offset
 
     _init_objective(bqm, reduced_terms)
 
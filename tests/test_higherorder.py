@@ -42,6 +42,20 @@ class TestMakeQuadratic(unittest.TestCase):
                                 (+1, -1, -1),
                                 (+1, +1, +1)})
 
+    def test_spin_constraint(self):
+        bqm = make_quadratic({'abc': -1}, 3.0, dimod.SPIN)
+
+        (u, v), = bqm.info['reduction']
+        p = bqm.info['reduction'][(u, v)]['product']
+        aux = bqm.info['reduction'][(u, v)]['auxiliary']
+
+        w, = set('abc') - {u, v}
+        expected = dimod.higherorder.utils._spin_product([u, v, p, aux])
+        expected.scale(3.0)
+        expected.add_interaction(w, p, -1)
+
+        self.assertEqual(bqm, expected)
+
     def test_empty(self):
         bqm = make_quadratic({}, 1.0, dimod.SPIN)
         self.assertEqual(bqm, dimod.BinaryQuadraticModel.empty(dimod.SPIN))
@@ -240,6 +254,31 @@ class TestMakeQuadratic(unittest.TestCase):
 
             self.assertAlmostEqual(energy, min(reduced_energies))
 
+    def test_mixed_labels(self):
+        # -1 and -2 have the same hash and ints and strs are not orderable
+        HUBO = {(-1, -2, 'a'): .5, (-1, -2, 0): -1, ('a', 0, -1): 1.5,
+                ('a', -2): -1}
+
+        bqm = make_quadratic(HUBO, 1000.0, dimod.BINARY)
+
+        variables = set().union(*HUBO)
+        aux_variables = tuple(set(bqm.linear) - variables)
+        variables = tuple(variables)
+        self.assertTrue(aux_variables)
+        for config in itertools.product((0, 1), repeat=len(variables)):
+            sample = dict(zip(variables, config))
+
+            energy = poly_energy(sample, HUBO)
+
+            reduced_energies = []
+            for aux_config in itertools.product((0, 1),
+                                                repeat=len(aux_variables)):
+                aux_sample = dict(zip(aux_variables, aux_config))
+                aux_sample.update(sample)
+                reduced_energies.append(bqm.energy(aux_sample))
+
+            self.assertAlmostEqual(energy, min(reduced_energies))
+
     def test_poly_energies(self):
         linear = {0: 1.0, 1: 1.0}
         j = {(0, 1, 2): 0.5}
@@ -268,3 +307,67 @@ class TestMakeQuadratic(unittest.TestCase):
 
         with self.assertRaises(ValueError):
             poly_energy(samples, poly)
+
+
+class TestReduceBinaryPolynomial(unittest.TestCase):
+    def test_cubic(self):
+        poly = dimod.BinaryPolynomial({'abc': 1, 'def': -1, 'dg': .5},
+                                      dimod.BINARY)
+
+        terms, constraints = dimod.reduce_binary_polynomial(poly)
+
+        self.assertEqual(len(constraints), 2)
+        products = {p: pair for pair, p in constraints}
+        for term, bias in terms:
+            self.assertLessEqual(len(term), 2)
+
+        # substituting the products back gives the original polynomial
+        expanded = dimod.BinaryPolynomial({}, dimod.BINARY)
+        for term, bias in terms:
+            expanded[frozenset().union(*(products.get(v, {v}) for v in term))] = bias
+        self.assertEqual(expanded, poly)
+
+    def test_shared_pair(self):
+        poly = dimod.BinaryPolynomial({'abc': 1, 'abd': -1, 'cd': .5},
+                                      dimod.BINARY)
+
+        terms, constraints = dimod.reduce_binary_polynomial(poly)
+
+        self.assertEqual(len(constraints), 1)
+        (pair, p), = constraints
+        self.assertEqual(pair, frozenset('ab'))
+        self.assertIn(p, ('a*b', 'b*a'))
+
+
+class TestReduceBinaryPolynomialBatch(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(dimod.reduce_binary_polynomial_batch([]), [])
+
+    def test_shared_pair(self):
+        polys = [dimod.BinaryPolynomial({'abc': 1, 'abd': -1, 'a': .5}, dimod.BINARY),
+                 dimod.BinaryPolynomial({'abe': -1}, dimod.BINARY),
+                 dimod.BinaryPolynomial({'cd': 2}, dimod.BINARY)]
+
+        results = dimod.reduce_binary_polynomial_batch(polys)
+
+        self.assertEqual(len(results), 3)
+
+        # each polynomial is reduced as it would be on its own
+        for poly, (terms, constraints) in zip(polys, results):
+            alone = dimod.reduce_binary_polynomial(poly)
+            self.assertEqual(len(terms), len(alone[0]))
+            self.assertEqual(len(constraints), len(alone[1]))
+
+            products = {p: pair for pair, p in constraints}
+            expanded = dimod.BinaryPolynomial({}, dimod.BINARY)
+            for term, bias in terms:
+                expanded[frozenset().union(*(products.get(v, {v}) for v in term))] = bias
+            self.assertEqual(expanded, poly)
+
+        # but a, b share the same product
+        (pair0, p0), = results[0][1]
+        (pair1, p1), = results[1][1]
+        self.assertEqual(pair0, frozenset('ab'))
+        self.assertEqual(pair1, frozenset('ab'))
+        self.assertEqual(p0, p1)
+        self.assertEqual(results[2][1], [])